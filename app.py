@@ -1,96 +1,322 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
+try:
+    import numexpr as ne
+except ImportError:  # optional accelerator; NumPy path below is equivalent
+    ne = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional accelerator; NumPy path below is equivalent
+    njit = None
+
 st.set_page_config(page_title="ETF Fund Flows Analysis", layout="wide")
 
-def parse_aum(aum_str):
-    """Parse AUM string like '$868.24B' to millions"""
-    if pd.isna(aum_str):
-        return None
-    aum_str = str(aum_str).replace('$', '').replace(',', '').strip()
-    if aum_str in ['-', '', 'N/A', 'nan']:
-        return None
-    try:
-        if aum_str.endswith('B'):
-            return float(aum_str[:-1]) * 1000  # Convert B to M
-        elif aum_str.endswith('M'):
-            return float(aum_str[:-1])
-        elif aum_str.endswith('K'):
-            return float(aum_str[:-1]) / 1000
-        else:
-            return float(aum_str)
-    except ValueError:
-        return None
+XLSX_PATH = 'ETF_Fund_Flows_5016_Complete.xlsx'
+CACHE_DIR = Path('cache')
+
+def _load_sheets():
+    """Load the four flow sheets, via a local Parquet cache when available.
+
+    pd.read_excel is by far the slowest part of a cold start, so the first
+    load converts each sheet to Parquet (with the Date column already
+    parsed) and later cold starts read the binary files instead. The cache
+    is rebuilt whenever the workbook is newer than the cached files.
+    """
+    names = ['ARK funds', 'top100 inflows', 'top100 outflows', 'list']
+    paths = {name: CACHE_DIR / f"{name.replace(' ', '_')}.parquet" for name in names}
+
+    xlsx_mtime = Path(XLSX_PATH).stat().st_mtime
+    if all(path.exists() and path.stat().st_mtime >= xlsx_mtime
+           for path in paths.values()):
+        return [pd.read_parquet(paths[name]) for name in names]
+
+    # Read the four sheets concurrently; openpyxl's XML parsing releases
+    # the GIL enough that this approaches the cost of the slowest sheet.
+    # Each worker opens the workbook itself — ExcelFile isn't thread-safe
+    with ThreadPoolExecutor(max_workers=len(names)) as ex:
+        sheets = list(ex.map(lambda name: pd.read_excel(XLSX_PATH, sheet_name=name), names))
+
+    # Convert Date columns before caching so the Parquet fast path skips
+    # parsing entirely; cache=True dedupes repeated date strings so each
+    # unique day is parsed once across the three sheets' shared calendar
+    for df in sheets[:3]:
+        df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y', cache=True)
+        # float32 is plenty for flows displayed at two decimals and halves
+        # the memory traffic of every downstream transform
+        num_cols = df.columns.difference(['Date'])
+        df[num_cols] = df[num_cols].astype(np.float32)
+
+    # The list sheet mixes '-' placeholders into its numeric flow columns;
+    # coerce them to NaN so the columns are properly numeric (and Parquet-safe)
+    etf_list = sheets[3]
+    for col in etf_list.columns:
+        if 'Fund Flow' in col:
+            etf_list[col] = pd.to_numeric(etf_list[col], errors='coerce')
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    for name, df in zip(names, sheets):
+        df.to_parquet(paths[name], compression='zstd')
+    return sheets
 
 @st.cache_data
 def load_data():
-    xlsx = pd.ExcelFile('ETF_Fund_Flows_5016_Complete.xlsx')
-    ark_funds = pd.read_excel(xlsx, sheet_name='ARK funds')
-    top100_inflows = pd.read_excel(xlsx, sheet_name='top100 inflows')
-    top100_outflows = pd.read_excel(xlsx, sheet_name='top100 outflows')
-    etf_list = pd.read_excel(xlsx, sheet_name='list')
-
-    # Convert Date columns
-    for df in [ark_funds, top100_inflows, top100_outflows]:
-        df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+    ark_funds, top100_inflows, top100_outflows, etf_list = _load_sheets()
 
-    # Load AUM data
+    # Load AUM data; parse strings like '$868.24B' to millions with
+    # vectorized string ops instead of a per-row Python parser
     aum_df = pd.read_csv('etf_screener_data.csv')
-    aum_dict = {}
-    for _, row in aum_df.iterrows():
-        ticker = row['Ticker']
-        aum = parse_aum(row['AUM'])
-        if aum:
-            aum_dict[ticker] = aum
+    s = (aum_df['AUM'].astype(str)
+         .str.replace('$', '', regex=False)
+         .str.replace(',', '', regex=False)
+         .str.strip())
+    unit = s.str[-1]
+    has_unit = unit.isin(['B', 'M', 'K'])
+    num = pd.to_numeric(s.str[:-1].where(has_unit, s), errors='coerce')
+    mult = unit.map({'B': 1000.0, 'M': 1.0, 'K': 0.001}).fillna(1.0)
+    vals = num * mult
+    valid = vals.notna() & (vals != 0)
+    aum_dict = dict(zip(aum_df.loc[valid, 'Ticker'], vals[valid]))
+
+    sheets = {'ark': ark_funds, 'inflows': top100_inflows,
+              'outflows': top100_outflows}
+
+    # Ticker tuples per sheet, computed once instead of rebuilt from
+    # df.columns on every rerun (and hashable, so usable in cache keys)
+    ticker_cols = {
+        key: tuple(c for c in df.columns if c != 'Date')
+        for key, df in sheets.items()
+    }
+
+    # Structure-of-arrays layout: one (dates, float32 matrix) pair per
+    # sheet. Everything downstream works on the matrices, so the frames
+    # themselves never leave this function
+    flow_data = {
+        key: (df['Date'].to_numpy(),
+              np.ascontiguousarray(df[list(ticker_cols[key])].to_numpy(dtype=np.float32)))
+        for key, df in sheets.items()
+    }
+
+    # Pre-align an AUM scale vector (100 / AUM, in sheet column order) so
+    # the %-of-AUM transform is a pure broadcast multiply: no per-column
+    # dict lookups, no divide, no NaN handling left for the hot path.
+    # Tickers without AUM get scale 0 and stay flat at zero
+    aum_scales = {
+        key: np.array([100.0 / aum_dict[c] if c in aum_dict else 0.0
+                       for c in cols], dtype=np.float32)
+        for key, cols in ticker_cols.items()
+    }
 
     # Load 1 Yr Fund Flow for sorting (by absolute value)
-    flow_1yr_dict = {}
-    for _, row in etf_list.iterrows():
-        ticker = row['Ticker']
-        flow = row['1 Yr Fund Flow']
-        if pd.notna(flow):
-            flow_1yr_dict[ticker] = flow
+    flow_1yr = etf_list['1 Yr Fund Flow']
+    has_flow = flow_1yr.notna()
+    flow_1yr_dict = dict(zip(etf_list.loc[has_flow, 'Ticker'], flow_1yr[has_flow]))
+
+    # Sort the selector ticker lists here, where the result is cached with
+    # the data, instead of re-sorting on every rerun
+    sorted_tickers = {
+        key: _sort_by_abs_flow(ticker_cols[key], flow_1yr_dict)
+        for key in ('inflows', 'outflows')
+    }
 
-    return ark_funds, top100_inflows, top100_outflows, aum_dict, flow_1yr_dict, etf_list
+    return flow_data, aum_scales, etf_list, ticker_cols, sorted_tickers
 
-def get_sorted_tickers_by_1yr_flow(tickers, flow_1yr_dict):
+def _sort_by_abs_flow(tickers, flow_1yr_dict):
     """Sort tickers by absolute value of 1 Yr Fund Flow (largest first)"""
-    return sorted(tickers, key=lambda x: abs(flow_1yr_dict.get(x, 0)), reverse=True)
+    flows = np.fromiter((abs(flow_1yr_dict.get(t, 0.0)) for t in tickers),
+                        dtype=np.float64, count=len(tickers))
+    order = np.argsort(-flows, kind='stable')
+    return [tickers[i] for i in order]
+
+@st.cache_resource(show_spinner=False)
+def _get_fused_transform():
+    """Build and warm the fused transform kernel once per process.
+
+    Streamlit re-executes this script on every rerun, so defining the
+    kernel at module level would recreate the numba dispatcher (and redo
+    the warmup call) per interaction; cache_resource keeps one compiled
+    kernel alive instead. Returns None when numba is unavailable.
+    """
+    if njit is None:
+        return None
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def kernel(arr, aum_scale, do_cum, do_aum):
+        """Cumsum and %-of-AUM scaling fused into one pass over the matrix,
+        parallelized across columns. aum_scale holds precomputed 100/AUM
+        factors (zero for tickers without AUM), matching the NumPy path."""
+        rows, cols = arr.shape
+        out = np.empty_like(arr)
+        for c in prange(cols):
+            scale = aum_scale[c] if do_aum else np.float32(1.0)
+            acc = np.float32(0.0)
+            for r in range(rows):
+                v = arr[r, c]
+                if do_cum:
+                    acc += v
+                    v = acc
+                out[r, c] = v * scale
+        return out
+
+    # Pay the JIT compilation cost here, not on the first interaction
+    kernel(np.zeros((2, 2), dtype=np.float32),
+           np.ones(2, dtype=np.float32), True, True)
+    return kernel
+
+# 3 sheets x 2 flow types x 2 value types: the caches below can hold every
+# reachable view, so radio flips are always hits and memory stays bounded
+@st.cache_data(max_entries=12)
+def transform_flows(sheet_key, flow_type, value_type):
+    """Return (dates, values, columns) for the flow sheet in the given view.
+
+    Cached per (sheet, flow_type, value_type) so widget changes that only
+    touch the ticker selection reuse the precomputed arrays. Keyed by sheet
+    name rather than the DataFrame itself to keep cache lookups cheap; the
+    underlying frames come from the cached load_data(). Returning plain
+    arrays instead of a DataFrame avoids rebuilding (and re-copying) a
+    frame on every chart build — consumers slice columns by position.
+    """
+    flow_data, aum_scales, _, ticker_cols, _ = load_data()
+    dates, arr = flow_data[sheet_key]
+    aum_scale = aum_scales[sheet_key]
+    columns = ticker_cols[sheet_key]
+
+    # Daily + Absolute Value is the identity view: hand back the loaded
+    # matrix without running (and allocating) any transform
+    if flow_type != "Cumulative" and value_type != "% of AUM":
+        return dates, arr, columns
+
+    fused_transform = _get_fused_transform()
+    if fused_transform is not None:
+        arr = fused_transform(arr, aum_scale,
+                              flow_type == "Cumulative",
+                              value_type == "% of AUM")
+    else:
+        if flow_type == "Cumulative":
+            arr = np.cumsum(arr, axis=0)
+
+        if value_type == "% of AUM":
+            scale_row = aum_scale[None, :]
+            if ne is not None:
+                # numexpr runs the broadcast multiply in one SIMD pass
+                arr = ne.evaluate("arr * scale_row")
+            else:
+                arr = arr * scale_row
+
+    return dates, arr, columns
 
-def create_chart(ark_df, top100_df, chart_title, flow_type, value_type, selected_tickers, highlight_tickers, aum_dict):
+M4_WIDTH = 1200  # target chart width in pixels for downsampling
+
+def _m4_points(width):
+    """Point budget below which a series is sent to the browser untouched."""
+    return 4 * width
+
+def _m4_indices(y, width=M4_WIDTH):
+    """Row indices for M4 downsampling: keep the first, last, min and max
+    point per pixel-column bucket, which renders identically to the full
+    series. Returns None when the series is already at pixel resolution.
+
+    M4 is used rather than LTTB: it is pixel-exact instead of perceptual,
+    and being index-based it lets x, y and hover customdata be masked with
+    the same selection so they stay aligned.
+    """
+    n = len(y)
+    if n <= _m4_points(width):
+        return None
+    edges = np.linspace(0, n, width + 1).astype(np.int64)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = y[lo:hi]
+        keep.extend((lo, lo + int(np.nanargmin(seg)), lo + int(np.nanargmax(seg)), hi - 1))
+    return np.unique(np.array(keep, dtype=np.int64))
+
+@st.cache_data(max_entries=12)
+def m4_downsample(sheet_key, flow_type, value_type, width=M4_WIDTH):
+    """Per-column M4 keep-indices for a transformed sheet, or None when the
+    sheet is short enough to send as-is."""
+    _, arr, columns = transform_flows(sheet_key, flow_type, value_type)
+    if arr.shape[0] <= _m4_points(width):
+        return None
+    return {col: _m4_indices(arr[:, i], width) for i, col in enumerate(columns)}
+
+# Keyed on the ticker selection too, so entries are capped rather than
+# accumulating one concatenated overlay per distinct selection
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_background_overlay(sheet_key, flow_type, value_type, tickers):
+    """Single NaN-separated Scattergl trace drawing every non-highlighted
+    top100 line at once.
+
+    Plotly's hover and calcdata costs scale with trace count far more than
+    with point count, so concatenating the gray lines with NaN gaps into
+    one trace keeps the individual view responsive. The gray cloud skips
+    hover entirely; highlighted tickers keep their own named traces.
+    Returns a plain dict so it pickles cheaply, cached per selection.
+    """
+    dates, arr, columns = transform_flows(sheet_key, flow_type, value_type)
+    idx = m4_downsample(sheet_key, flow_type, value_type)
+    col2idx = _col_index(columns)
+
+    x_gap = np.array(['NaT'], dtype=dates.dtype)
+    y_gap = np.array([np.nan], dtype=np.float32)
+    xs, ys = [], []
+    for ticker in tickers:
+        x, y = dates, arr[:, col2idx[ticker]]
+        if idx is not None:
+            keep = idx[ticker]
+            x, y = x[keep], y[keep]
+        xs.extend((x, x_gap))
+        ys.extend((y, y_gap))
+
+    return dict(
+        type='scattergl',
+        x=np.concatenate(xs),
+        y=np.concatenate(ys),
+        mode='lines',
+        name='Top 100 ETFs',
+        line=dict(color='rgba(150, 150, 150, 0.3)', width=1),
+        hoverinfo='skip',
+        legendgroup='top100'
+    )
+
+@lru_cache(maxsize=None)
+def _col_index(columns):
+    """Hash-based ticker -> column position map, built once per sheet
+    rather than on every chart build (membership tests against an Index
+    would be O(n) per ticker)."""
+    return {col: i for i, col in enumerate(columns)}
+
+@lru_cache(maxsize=None)
+def _hover_template(ark_columns, highlight_columns, unit):
+    """Hover template listing the ARK values (and any highlighted tickers)
+    from customdata. Memoized so every trace in every rerun shares one
+    string object instead of re-joining ~10 f-strings per chart build."""
+    ark_lines = "<br>".join([f"{col}: %{{customdata[{i}]:.2f}}{unit}" for i, col in enumerate(ark_columns)])
+    head = f"%{{x|%Y-%m-%d}}<br><b>%{{fullData.name}}: %{{y:.2f}}{unit}</b><br>---<br>{ark_lines}"
+    if highlight_columns:
+        highlight_lines = "<br>".join([f"{col}: %{{customdata[{len(ark_columns) + i}]:.2f}}{unit}" for i, col in enumerate(highlight_columns)])
+        return f"{head}<br>---<br><b>Highlight:</b><br>{highlight_lines}<extra></extra>"
+    return f"{head}<extra></extra>"
+
+def create_chart(top100_key, chart_title, flow_type, value_type, selected_tickers, highlight_tickers, show_individual=False):
     """Create a plotly chart comparing ARK funds vs top100"""
-    fig = go.Figure()
+    traces = []
 
-    # Get ARK fund columns
-    ark_columns = [col for col in ark_df.columns if col != 'Date']
-    # Filter top100 columns based on selection
-    top100_columns = [col for col in selected_tickers if col in top100_df.columns]
+    # Pull the precomputed arrays for this view
+    ark_dates, ark_arr, ark_columns = transform_flows('ark', flow_type, value_type)
+    dates, top100_arr, all_top100_columns = transform_flows(top100_key, flow_type, value_type)
+    col2idx = _col_index(all_top100_columns)
 
-    # Prepare data based on flow type
-    if flow_type == "Cumulative":
-        ark_data = ark_df.copy()
-        top100_data = top100_df.copy()
-        for col in ark_columns:
-            ark_data[col] = ark_data[col].cumsum()
-        for col in top100_columns:
-            top100_data[col] = top100_data[col].cumsum()
-    else:  # Daily
-        ark_data = ark_df.copy()
-        top100_data = top100_df.copy()
-
-    # Calculate percentage of AUM if selected
-    if value_type == "% of AUM":
-        for col in ark_columns:
-            if col in aum_dict and aum_dict[col] > 0:
-                ark_data[col] = ark_data[col] / aum_dict[col] * 100
-            else:
-                ark_data[col] = 0
-        for col in top100_columns:
-            if col in aum_dict and aum_dict[col] > 0:
-                top100_data[col] = top100_data[col] / aum_dict[col] * 100
-            else:
-                top100_data[col] = 0
+    # Filter top100 columns based on selection
+    top100_columns = [col for col in selected_tickers if col in col2idx]
 
     # Build customdata with all ARK values for each date
     ark_colors = {
@@ -109,71 +335,112 @@ def create_chart(ark_df, top100_df, chart_title, flow_type, value_type, selected
     highlight_list = list(highlight_tickers) if highlight_tickers else []
     highlight_set = set(highlight_list)
 
-    # Combine ARK data and highlight data for customdata
-    import numpy as np
+    # Combine ARK data and highlight data for customdata. The transform
+    # already yields a contiguous float32 ARK matrix, so the no-highlight
+    # path attaches it as-is; the stacked variant stays float32 too (a
+    # float64 filler here would silently promote the whole block and double
+    # the serialized size). Customdata goes only on the few traces whose
+    # hover actually reads it — ARK, the mean line and highlights; giving
+    # it to the ~100 background lines would serialize the same matrix once
+    # per trace, which is why they hover without it
     if highlight_list:
-        highlight_data_cols = [top100_data[col].values if col in top100_data.columns else np.zeros(len(top100_data)) for col in highlight_list]
-        combined_customdata = np.column_stack([ark_data[ark_columns].values] + highlight_data_cols)
+        highlight_data_cols = [top100_arr[:, col2idx[col]] if col in col2idx else np.zeros(len(top100_arr), dtype=np.float32) for col in highlight_list]
+        combined_customdata = np.column_stack([ark_arr] + highlight_data_cols)
     else:
-        combined_customdata = ark_data[ark_columns].values
-
-    # Build hover template showing ARK funds
-    ark_hover_lines = "<br>".join([f"{col}: %{{customdata[{i}]:.2f}}{unit}" for i, col in enumerate(ark_columns)])
+        combined_customdata = ark_arr
+
+    # Shared hover template showing ARK funds (and highlights, if any)
+    full_hover = _hover_template(tuple(ark_columns), tuple(highlight_list), unit)
+
+    # Downsample to pixel resolution before handing data to Plotly
+    top100_idx = m4_downsample(top100_key, flow_type, value_type)
+    ark_idx = m4_downsample('ark', flow_type, value_type)
+
+    background_columns = [col for col in top100_columns if col not in highlight_set]
+    highlighted_columns = [col for col in top100_columns if col in highlight_set]
+
+    if show_individual:
+        if background_columns:
+            # All gray lines travel as one NaN-separated trace
+            traces.append(build_background_overlay(
+                top100_key, flow_type, value_type, tuple(background_columns)))
+    elif background_columns:
+        # Collapse the gray cloud into a min/max band plus a mean line;
+        # ~100 traces become 3, which renders and hovers far faster
+        bg = top100_arr[:, [col2idx[col] for col in background_columns]]
+        traces.append(dict(
+            type='scattergl',
+            x=dates,
+            y=np.nanmax(bg, axis=1),
+            mode='lines',
+            line=dict(width=0),
+            hoverinfo='skip',
+            legendgroup='top100',
+            showlegend=False
+        ))
+        traces.append(dict(
+            type='scattergl',
+            x=dates,
+            y=np.nanmin(bg, axis=1),
+            mode='lines',
+            name='Top 100 range',
+            fill='tonexty',
+            fillcolor='rgba(150, 150, 150, 0.2)',
+            line=dict(width=0),
+            hoverinfo='skip',
+            legendgroup='top100'
+        ))
+        traces.append(dict(
+            type='scattergl',
+            x=dates,
+            y=np.nanmean(bg, axis=1),
+            mode='lines',
+            name='Top 100 mean',
+            line=dict(color='rgba(120, 120, 120, 0.8)', width=1.5),
+            customdata=combined_customdata,
+            hovertemplate=full_hover,
+            legendgroup='top100'
+        ))
 
-    # Add highlighted tickers to hover if any
-    if highlight_list:
-        highlight_hover_lines = "<br>".join([f"{col}: %{{customdata[{len(ark_columns) + i}]:.2f}}{unit}" for i, col in enumerate(highlight_list)])
-        full_hover = f"%{{x|%Y-%m-%d}}<br><b>%{{fullData.name}}: %{{y:.2f}}{unit}</b><br>---<br>{ark_hover_lines}<br>---<br><b>Highlight:</b><br>{highlight_hover_lines}<extra></extra>"
-    else:
-        full_hover = f"%{{x|%Y-%m-%d}}<br><b>%{{fullData.name}}: %{{y:.2f}}{unit}</b><br>---<br>{ark_hover_lines}<extra></extra>"
-
-    # Add top100 lines
-    for col in top100_columns:
-        is_highlighted = col in highlight_set
-        if is_highlighted:
-            line_style = dict(color='#FF6600', width=2.5)
-            show_legend = True
-            legend_group = 'highlighted'
-        else:
-            line_style = dict(color='rgba(150, 150, 150, 0.3)', width=1)
-            show_legend = False
-            legend_group = 'top100'
-
-        fig.add_trace(go.Scatter(
-            x=top100_data['Date'],
-            y=top100_data[col],
+    # Highlighted tickers always get their own line
+    for col in highlighted_columns:
+        x, y, cd = dates, top100_arr[:, col2idx[col]], combined_customdata
+        if top100_idx is not None:
+            keep = top100_idx[col]
+            x, y, cd = x[keep], y[keep], cd[keep]
+
+        traces.append(dict(
+            type='scattergl',
+            x=x,
+            y=y,
             mode='lines',
             name=col,
-            line=line_style,
-            customdata=combined_customdata,
+            line=dict(color='#FF6600', width=2.5),
+            customdata=cd,
             hovertemplate=full_hover,
-            legendgroup=legend_group,
-            showlegend=show_legend
+            legendgroup='highlighted'
         ))
 
-    # Add ARK fund lines (colored, thicker, highlighted)
-    for col in ark_columns:
+    # Add ARK fund lines (colored, thicker, highlighted). These six stay
+    # SVG: they need crisp styling, and keeping them out of WebGL leaves
+    # the GL context budget to the top100 overlay
+    for i, col in enumerate(ark_columns):
         color = ark_colors.get(col, '#FF0000')
-        fig.add_trace(go.Scatter(
-            x=ark_data['Date'],
-            y=ark_data[col],
+        x, y, cd = ark_dates, ark_arr[:, i], combined_customdata
+        if ark_idx is not None:
+            keep = ark_idx[col]
+            x, y, cd = x[keep], y[keep], cd[keep]
+        traces.append(dict(
+            type='scatter',
+            x=x,
+            y=y,
             mode='lines',
             name=col,
             line=dict(color=color, width=3),
-            customdata=combined_customdata,
+            customdata=cd,
             hovertemplate=full_hover
         ))
 
-    # Add a dummy trace for legend grouping
-    fig.add_trace(go.Scatter(
-        x=[None],
-        y=[None],
-        mode='lines',
-        name='Top 100 ETFs',
-        line=dict(color='rgba(150, 150, 150, 0.5)', width=1),
-        legendgroup='top100'
-    ))
-
     if value_type == "Absolute Value":
         y_title = "Fund Flow ($ Millions)"
     else:
@@ -182,12 +449,18 @@ def create_chart(ark_df, top100_df, chart_title, flow_type, value_type, selected
     if flow_type == "Cumulative":
         y_title = "Cumulative " + y_title
 
-    fig.update_layout(
+    # Hand Plotly every trace at once; per-trace add_trace calls each pay
+    # their own validation round trip
+    fig = go.Figure(data=traces, layout=dict(
         title=f"{chart_title} - {flow_type} Flows ({value_type})",
         xaxis_title="Date",
         yaxis_title=y_title,
         height=600,
         hovermode='closest',
+        # Keep zoom/pan state across reruns: Plotly preserves view state
+        # as long as uirevision is unchanged, so widget toggles no longer
+        # reset the axes and the browser skips a full relayout
+        uirevision=top100_key,
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -195,23 +468,36 @@ def create_chart(ark_df, top100_df, chart_title, flow_type, value_type, selected
             xanchor="right",
             x=1
         )
-    )
+    ))
 
     return fig
 
+# cache_resource hands every session the same immutable bytes object;
+# cache_data would deserialize a fresh multi-MB copy per rerun
+@st.cache_resource
+def xlsx_bytes():
+    """Raw workbook bytes for the download button, read from disk once and
+    shared across sessions."""
+    return Path(XLSX_PATH).read_bytes()
+
 def main():
     st.title("ETF Fund Flows Analysis")
     st.markdown("Comparing **ARK Funds** performance against Top 100 ETFs")
     st.caption("Top 100 Inflows: ETFs with highest 1-Year Fund Flow | Top 100 Outflows: ETFs with lowest 1-Year Fund Flow")
 
     # Load data
-    ark_funds, top100_inflows, top100_outflows, aum_dict, flow_1yr_dict, etf_list = load_data()
+    flow_data, aum_scales, etf_list, ticker_cols, sorted_tickers = load_data()
 
-    # Get tickers sorted by absolute 1 Yr Fund Flow
-    inflow_tickers = [col for col in top100_inflows.columns if col != 'Date']
-    outflow_tickers = [col for col in top100_outflows.columns if col != 'Date']
-    inflow_tickers_sorted = get_sorted_tickers_by_1yr_flow(inflow_tickers, flow_1yr_dict)
-    outflow_tickers_sorted = get_sorted_tickers_by_1yr_flow(outflow_tickers, flow_1yr_dict)
+    # Warm every (sheet, flow_type, value_type) view up front — there are
+    # only 12 — so the first radio flip costs the same as the later ones
+    for sheet_key in ticker_cols:
+        for flow_type in ("Cumulative", "Daily"):
+            for value_type in ("Absolute Value", "% of AUM"):
+                transform_flows(sheet_key, flow_type, value_type)
+
+    # Tickers sorted by absolute 1 Yr Fund Flow, precomputed in load_data
+    inflow_tickers_sorted = sorted_tickers['inflows']
+    outflow_tickers_sorted = sorted_tickers['outflows']
 
     # Create tabs for different charts
     tab1, tab2, tab3 = st.tabs(["ARK vs Top100 Inflows", "ARK vs Top100 Outflows", "Download Data"])
@@ -236,14 +522,19 @@ def main():
             )
 
         with st.expander("**Filter Top 100 ETFs** (click to expand)", expanded=False):
-            selected_inflows = st.pills(
-                "Select ETFs:",
-                options=inflow_tickers_sorted,
-                default=inflow_tickers_sorted,
-                selection_mode="multi",
-                key="selected_inflows",
-                label_visibility="collapsed"
-            )
+            # A 100-pill widget with everything selected round-trips a
+            # ~100-element list on every rerun; 'all' is the common case,
+            # so it short-circuits the widget entirely
+            all_inflows = st.checkbox("Select all", value=True, key="all_inflows")
+            if all_inflows:
+                selected_inflows = inflow_tickers_sorted
+            else:
+                selected_inflows = st.multiselect(
+                    "Select ETFs:",
+                    options=inflow_tickers_sorted,
+                    key="selected_inflows",
+                    label_visibility="collapsed"
+                )
 
         with st.expander("**Highlight ETFs** (click to expand)", expanded=False):
             highlight_inflows = st.pills(
@@ -255,7 +546,13 @@ def main():
                 label_visibility="collapsed"
             )
 
-        fig1 = create_chart(ark_funds, top100_inflows, "ARK Funds vs Top 100 Inflows", flow_type_1, value_type_1, selected_inflows, highlight_inflows, aum_dict)
+        show_individual_1 = st.toggle(
+            "Show individual ETFs",
+            key="show_individual_inflows",
+            help="Off: summarize the Top 100 as a min/max band with a mean line"
+        )
+
+        fig1 = create_chart('inflows', "ARK Funds vs Top 100 Inflows", flow_type_1, value_type_1, selected_inflows, highlight_inflows, show_individual_1)
         st.plotly_chart(fig1, width="stretch")
 
     with tab2:
@@ -278,14 +575,16 @@ def main():
             )
 
         with st.expander("**Filter Top 100 ETFs** (click to expand)", expanded=False):
-            selected_outflows = st.pills(
-                "Select ETFs:",
-                options=outflow_tickers_sorted,
-                default=outflow_tickers_sorted,
-                selection_mode="multi",
-                key="selected_outflows",
-                label_visibility="collapsed"
-            )
+            all_outflows = st.checkbox("Select all", value=True, key="all_outflows")
+            if all_outflows:
+                selected_outflows = outflow_tickers_sorted
+            else:
+                selected_outflows = st.multiselect(
+                    "Select ETFs:",
+                    options=outflow_tickers_sorted,
+                    key="selected_outflows",
+                    label_visibility="collapsed"
+                )
 
         with st.expander("**Highlight ETFs** (click to expand)", expanded=False):
             highlight_outflows = st.pills(
@@ -297,23 +596,40 @@ def main():
                 label_visibility="collapsed"
             )
 
-        fig2 = create_chart(ark_funds, top100_outflows, "ARK Funds vs Top 100 Outflows", flow_type_2, value_type_2, selected_outflows, highlight_outflows, aum_dict)
+        show_individual_2 = st.toggle(
+            "Show individual ETFs",
+            key="show_individual_outflows",
+            help="Off: summarize the Top 100 as a min/max band with a mean line"
+        )
+
+        fig2 = create_chart('outflows', "ARK Funds vs Top 100 Outflows", flow_type_2, value_type_2, selected_outflows, highlight_outflows, show_individual_2)
         st.plotly_chart(fig2, width="stretch")
 
     with tab3:
         st.subheader("Download Data")
 
-        with open('ETF_Fund_Flows_5016_Complete.xlsx', 'rb') as f:
-            st.download_button(
-                label="Download ETF Fund Flows Data (Excel)",
-                data=f,
-                file_name="ETF_Fund_Flows_5016_Complete.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        st.download_button(
+            label="Download ETF Fund Flows Data (Excel)",
+            data=xlsx_bytes(),
+            file_name="ETF_Fund_Flows_5016_Complete.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
 
         st.markdown("---")
-        st.markdown("### Fund List (5016 ETFs)")
-        st.dataframe(etf_list, width="stretch", height=500)
+        st.markdown(f"### Fund List ({len(etf_list)} ETFs)")
+        # Paginate instead of shipping all ~5000 rows to the browser on
+        # every visit to this tab
+        page_size = 100
+        n_pages = (len(etf_list) - 1) // page_size + 1
+        page = st.number_input(
+            f"Page (1-{n_pages})",
+            min_value=1,
+            max_value=n_pages,
+            value=1,
+            key="fund_list_page"
+        )
+        start = (page - 1) * page_size
+        st.dataframe(etf_list.iloc[start:start + page_size], width="stretch", height=500)
 
 if __name__ == "__main__":
     main()